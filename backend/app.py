@@ -2,19 +2,62 @@
 Flask API for Fake News Detection System
 """
 
+import os
+
+# TensorFlow runtime knobs; these must be set before tensorflow is
+# imported. oneDNN enables fused SIMD conv/dense kernels, and the thread
+# counts stop TF from oversubscribing cores (gunicorn.conf.py partitions
+# them across workers)
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', str(os.cpu_count() or 1))
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '1')
+
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import numpy as np
 import tensorflow as tf
-import os
 import sys
+import queue
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
 
 # Import local modules
-from config import MODEL_PATH, TOKENIZER_PATH, DEBUG, HOST, PORT, MAX_WORDS, MAX_LEN
+from config import (
+    MODEL_PATH, LEGACY_MODEL_PATH, TFLITE_MODEL_PATH, TOKENIZER_PATH,
+    VOCAB_PATH, DEBUG, HOST, PORT,
+    MAX_WORDS, MAX_LEN, LENGTH_BUCKETS,
+    MAX_BATCH_SIZE, BATCH_TIMEOUT_MS, INFERENCE_TIMEOUT_S
+)
 from utils import TextPreprocessor, analyze_prediction, get_model_summary
 
+# Let XLA fuse the conv/pool/dense chain into fewer kernels
+tf.config.optimizer.set_jit(True)
+
+# orjson encodes responses in C (and serializes numpy scalars natively);
+# stdlib json is kept as a fallback
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class ORJSONProvider(JSONProvider):
+        """Flask JSON provider backed by orjson"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    Flask.json_provider_class = ORJSONProvider
+except ImportError:
+    pass
+
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 86400
 CORS(app)
 
 # Initialize preprocessor
@@ -25,47 +68,278 @@ print("=" * 60)
 print("🔍 FAKE NEWS DETECTION SYSTEM API")
 print("=" * 60)
 
-print("\n🔄 Loading model and tokenizer...")
+print("\n🔄 Loading model and vocabulary...")
+model = None
+infer = None
+interpreter = None
 try:
-    model = tf.keras.models.load_model(MODEL_PATH)
-    tokenizer = preprocessor.load_tokenizer(TOKENIZER_PATH)
-    print("✅ Model and tokenizer loaded successfully!")
+    if os.path.exists(VOCAB_PATH):
+        vocab = preprocessor.load_vocab(VOCAB_PATH)
+    else:
+        # Older training runs only shipped the pickled tokenizer; pull the
+        # compact word→id table out of it once at startup
+        vocab = preprocessor.vocab_from_tokenizer(
+            preprocessor.load_tokenizer(TOKENIZER_PATH)
+        )
+    if os.path.exists(TFLITE_MODEL_PATH):
+        # Prefer the TFLite model: XNNPACK runs the Conv1D/Dense kernels
+        # with fused SIMD micro-kernels at a fraction of the TF runtime cost
+        interpreter = tf.lite.Interpreter(
+            model_path=TFLITE_MODEL_PATH,
+            num_threads=os.cpu_count()
+        )
+        interpreter.allocate_tensors()
+        input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+        print("✅ TFLite model and vocabulary loaded successfully!")
+    else:
+        model_path = MODEL_PATH if os.path.exists(MODEL_PATH) else LEGACY_MODEL_PATH
+        model = tf.keras.models.load_model(model_path)
+        # Trace the forward pass once per length bucket, so requests skip
+        # model.predict's per-call wrapping and retrace checks
+        infer = {
+            length: tf.function(lambda x: model(x, training=False)).get_concrete_function(
+                tf.TensorSpec([None, length], tf.int32)
+            )
+            for length in LENGTH_BUCKETS
+        }
+        print("✅ Model and vocabulary loaded successfully!")
 except Exception as e:
     print(f"❌ Error loading model: {e}")
     model = None
-    tokenizer = None
+    vocab = None
+    infer = None
+    interpreter = None
+
+MODEL_LOADED = model is not None or interpreter is not None
+
+def run_model(batch):
+    """Run one forward pass on a [N, bucket_len] batch of token ids"""
+    global input_detail
+    if interpreter is not None:
+        if tuple(input_detail['shape']) != batch.shape:
+            interpreter.resize_tensor_input(input_detail['index'], batch.shape)
+            interpreter.allocate_tensors()
+            input_detail = interpreter.get_input_details()[0]
+        interpreter.set_tensor(input_detail['index'], batch.astype(input_detail['dtype']))
+        interpreter.invoke()
+        return interpreter.get_tensor(output_detail['index'])
+    return infer[batch.shape[1]](tf.constant(batch, dtype=tf.int32)).numpy()
+
+# Queue feeding the background inference worker
+inference_queue = queue.Queue()
+
+def batch_worker():
+    """
+    Background worker that coalesces concurrent prediction requests.
+
+    Drains up to MAX_BATCH_SIZE queued samples (waiting at most
+    BATCH_TIMEOUT_MS for stragglers), runs one forward pass per length
+    bucket on the stacked batch and hands each caller its own row of
+    the result.
+    """
+    while True:
+        jobs = [inference_queue.get()]
+        deadline = time.monotonic() + BATCH_TIMEOUT_MS / 1000.0
+        while len(jobs) < MAX_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(inference_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Group jobs by padded length so each bucket runs through its
+        # own specialized graph
+        buckets = {}
+        for job in jobs:
+            buckets.setdefault(job['input'].shape[1], []).append(job)
+
+        for bucket_jobs in buckets.values():
+            try:
+                batch = np.vstack([job['input'] for job in bucket_jobs])
+                probs = run_model(batch)
+                for job, prob in zip(bucket_jobs, probs):
+                    job['output'] = prob.reshape(1, -1)
+            except Exception as e:
+                for job in bucket_jobs:
+                    job['error'] = e
+            finally:
+                for job in bucket_jobs:
+                    job['done'].set()
+
+# The worker is started lazily, on the first prediction in each process,
+# so it exists in every gunicorn worker rather than only wherever the
+# module happened to be imported
+_worker_lock = threading.Lock()
+_worker_started = False
+
+def ensure_worker():
+    """Start this process's inference worker thread if it isn't running"""
+    global _worker_started
+    if not _worker_started:
+        with _worker_lock:
+            if not _worker_started:
+                threading.Thread(target=batch_worker, daemon=True).start()
+                _worker_started = True
+
+def run_inference(processed_text):
+    """Submit a preprocessed sample to the batch worker and wait for the result"""
+    ensure_worker()
+    job = {'input': processed_text, 'output': None, 'error': None, 'done': threading.Event()}
+    inference_queue.put(job)
+    if not job['done'].wait(timeout=INFERENCE_TIMEOUT_S):
+        raise RuntimeError('Inference timed out')
+    if job['error'] is not None:
+        raise job['error']
+    return job['output']
+
+# LRU cache of analyzed results keyed by a hash of the cleaned text, so
+# repeat submissions of the same article skip preprocessing and inference
+PREDICTION_CACHE_SIZE = 4096
+prediction_cache = OrderedDict()
+prediction_cache_lock = threading.Lock()
+
+def cache_get(key):
+    """Look up a cached prediction result, refreshing its LRU position"""
+    with prediction_cache_lock:
+        result = prediction_cache.get(key)
+        if result is not None:
+            prediction_cache.move_to_end(key)
+        return result
+
+def cache_put(key, result):
+    """Store a prediction result, evicting the least recently used entry"""
+    with prediction_cache_lock:
+        prediction_cache[key] = result
+        if len(prediction_cache) > PREDICTION_CACHE_SIZE:
+            prediction_cache.popitem(last=False)
+
+# Coarse timestamp refreshed by a daemon ticker; formatting
+# datetime.now().isoformat() on every request adds up at high QPS and
+# quarter-second resolution is plenty for history entries
+_now_iso = datetime.now().isoformat()
+_now_refreshed = time.monotonic()
+
+def timestamp_ticker():
+    global _now_iso, _now_refreshed
+    while True:
+        _now_iso = datetime.now().isoformat()
+        _now_refreshed = time.monotonic()
+        time.sleep(0.25)
 
-# Store prediction history
-prediction_history = []
+def now_iso():
+    """Current timestamp; recomputed if the ticker isn't keeping it fresh
+    (e.g. this process was forked after the thread started)"""
+    if time.monotonic() - _now_refreshed > 1.0:
+        return datetime.now().isoformat()
+    return _now_iso
+
+threading.Thread(target=timestamp_ticker, daemon=True).start()
+
+# Store the last 100 predictions; deque drops the oldest entry in O(1)
+# and its append is atomic, so concurrent worker threads can't corrupt it
+prediction_history = deque(maxlen=100)
+prediction_counter = itertools.count(1)
 
 @app.route('/')
 def index():
     """Serve the main application"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_from_directory(app.static_folder, 'index.html',
+                               max_age=86400, conditional=True)
 
 @app.route('/<path:path>')
 def static_files(path):
-    """Serve static files"""
-    return send_from_directory(app.static_folder, path)
+    """Serve static files with caching and conditional GET"""
+    return send_from_directory(app.static_folder, path,
+                               max_age=86400, conditional=True)
+
+def predict_items(items):
+    """
+    Predict a list of {"title", "text"} items as one padded batch.
+
+    Cached articles are answered directly; the rest are queued together
+    so the inference worker stacks them into shared forward passes.
+    """
+    cleaned_texts = [
+        preprocessor.clean_text(
+            f"{item.get('title', '')} {item.get('text', '')}".strip()
+        )
+        for item in items
+    ]
+
+    results = [None] * len(items)
+    pending = []
+    for i, cleaned_text in enumerate(cleaned_texts):
+        cache_key = hashlib.blake2b(cleaned_text.encode(), digest_size=16).digest()
+        cached = cache_get(cache_key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            processed_text = preprocessor.preprocess_for_prediction(cleaned_text, vocab)
+            job = {'input': processed_text, 'output': None, 'error': None,
+                   'done': threading.Event()}
+            pending.append((i, cache_key, job))
+
+    if pending:
+        ensure_worker()
+    for _, _, job in pending:
+        inference_queue.put(job)
+
+    for i, cache_key, job in pending:
+        if not job['done'].wait(timeout=INFERENCE_TIMEOUT_S):
+            raise RuntimeError('Inference timed out')
+        if job['error'] is not None:
+            raise job['error']
+        result = analyze_prediction(job['output'])
+        cache_put(cache_key, result)
+        results[i] = result
+
+    return results
 
 @app.route('/api/predict', methods=['POST'])
 def predict():
     """
     Predict whether news is fake or real
     Expected JSON: {"title": "news title", "text": "news content"}
+    or a batch: {"items": [{"title": ..., "text": ...}, ...]}
     """
-    if model is None or tokenizer is None:
+    if not MODEL_LOADED or vocab is None:
         return jsonify({
             'success': False,
             'error': 'Model not loaded. Please train the model first.'
         }), 503
-    
+
     try:
         data = request.get_json()
-        
+
         if not data:
             return jsonify({'success': False, 'error': 'No data provided'}), 400
-        
+
+        # Batch payload: analyze all items in one go
+        if isinstance(data.get('items'), list):
+            items = data['items']
+            if not items:
+                return jsonify({'success': False, 'error': 'No items provided'}), 400
+            for i, item in enumerate(items):
+                if not isinstance(item, dict):
+                    return jsonify({
+                        'success': False,
+                        'error': f'Item {i} must be an object with title/text'
+                    }), 400
+                if not item.get('title') and not item.get('text'):
+                    return jsonify({
+                        'success': False,
+                        'error': f'Item {i}: please provide either title or text'
+                    }), 400
+            results = predict_items(items)
+            return jsonify({
+                'success': True,
+                'count': len(results),
+                'results': results
+            })
+
         title = data.get('title', '')
         text = data.get('text', '')
         
@@ -74,31 +348,34 @@ def predict():
         
         # Combine title and text
         full_text = f"{title} {text}".strip()
-        
-        # Preprocess text
-        processed_text = preprocessor.preprocess_for_prediction(full_text, tokenizer)
-        
-        # Make prediction
-        prediction_prob = model.predict(processed_text, verbose=0)
-        
-        # Analyze result
-        result = analyze_prediction(prediction_prob)
+
+        # Clean once so identical articles map to the same cache key
+        cleaned_text = preprocessor.clean_text(full_text)
+        cache_key = hashlib.blake2b(cleaned_text.encode(), digest_size=16).digest()
+
+        result = cache_get(cache_key)
+        if result is None:
+            # Preprocess text
+            processed_text = preprocessor.preprocess_for_prediction(cleaned_text, vocab)
+
+            # Make prediction (batched with any concurrent requests)
+            prediction_prob = run_inference(processed_text)
+
+            # Analyze result
+            result = analyze_prediction(prediction_prob)
+            cache_put(cache_key, result)
         
         # Store prediction in history
         prediction_entry = {
-            'id': len(prediction_history) + 1,
+            'id': next(prediction_counter),
             'title': title[:100] + '...' if len(title) > 100 else title,
             'text_preview': text[:150] + '...' if len(text) > 150 else text,
             'result': result['result'],
             'confidence': result['confidence'],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }
         prediction_history.append(prediction_entry)
-        
-        # Keep only last 100 predictions
-        if len(prediction_history) > 100:
-            prediction_history.pop(0)
-        
+
         return jsonify({
             'success': True,
             'prediction': result,
@@ -111,31 +388,40 @@ def predict():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/cache/clear', methods=['POST'])
+def clear_cache():
+    """Clear the prediction result cache"""
+    with prediction_cache_lock:
+        cleared = len(prediction_cache)
+        prediction_cache.clear()
+    return jsonify({'success': True, 'cleared': cleared})
+
 @app.route('/api/history', methods=['GET'])
 def get_history():
     """Get prediction history"""
     return jsonify({
-        'history': prediction_history,
+        'history': list(prediction_history),
         'count': len(prediction_history)
     })
 
 @app.route('/api/model-info', methods=['GET'])
 def model_info():
     """Get model information"""
-    if model is None:
+    if not MODEL_LOADED:
         return jsonify({
             'status': 'inactive',
             'message': 'Model not loaded'
         })
     
+    architecture = get_model_summary(model)
     return jsonify({
         'status': 'active',
         'type': 'CNN',
         'max_words': MAX_WORDS,
         'max_sequence_length': MAX_LEN,
-        'embedding_dim': 128,
+        'embedding_dim': architecture['embedding_dim'],
         'total_predictions': len(prediction_history),
-        'architecture': get_model_summary()
+        'architecture': architecture
     })
 
 @app.route('/api/health', methods=['GET'])
@@ -143,15 +429,15 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None,
-        'tokenizer_loaded': tokenizer is not None,
+        'model_loaded': MODEL_LOADED,
+        'tokenizer_loaded': vocab is not None,
         'total_predictions': len(prediction_history),
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now_iso()
     })
 
 if __name__ == '__main__':
     print(f"\n📍 Server running at: http://{HOST}:{PORT}")
-    print(f"📊 Model status: {'✅ Loaded' if model else '❌ Not loaded'}")
+    print(f"📊 Model status: {'✅ Loaded' if MODEL_LOADED else '❌ Not loaded'}")
     print("=" * 60)
     
     app.run(debug=DEBUG, host=HOST, port=PORT)
\ No newline at end of file
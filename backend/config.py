@@ -13,22 +13,33 @@ MODEL_DIR = os.path.join(BASE_DIR, 'model')
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 # Model configuration
-MAX_WORDS = 10000
+MAX_WORDS = 10000          # upper bound; training trims to VOCAB_COVERAGE
+VOCAB_COVERAGE = 0.99      # keep the smallest vocab covering this token share
 MAX_LEN = 500
-EMBEDDING_DIM = 128
+LENGTH_BUCKETS = (64, 128, 256, MAX_LEN)  # ascending padded-length buckets
+EMBEDDING_DIM = 64
 FILTERS = 128
 KERNEL_SIZE = 5
 DENSE_UNITS = 64
 DROPOUT_RATE = 0.5
 
-# File paths
-MODEL_PATH = os.path.join(MODEL_DIR, 'fake_news_cnn.h5')
+# File paths (.keras loads faster than HDF5; the .h5 path is kept so
+# model directories from older training runs still serve)
+MODEL_PATH = os.path.join(MODEL_DIR, 'fake_news_cnn.keras')
+LEGACY_MODEL_PATH = os.path.join(MODEL_DIR, 'fake_news_cnn.h5')
+TFLITE_MODEL_PATH = os.path.join(MODEL_DIR, 'fake_news_cnn.tflite')
 TOKENIZER_PATH = os.path.join(MODEL_DIR, 'tokenizer.pkl')
+VOCAB_PATH = os.path.join(MODEL_DIR, 'vocab.json')
 
 # Dataset paths (update these with your actual paths)
 FAKE_DATA_PATH = '/content/fake.csv'
 TRUE_DATA_PATH = '/content/true.csv'
 
+# Inference batching configuration
+MAX_BATCH_SIZE = 32
+BATCH_TIMEOUT_MS = 5
+INFERENCE_TIMEOUT_S = 30   # give up on a queued prediction after this long
+
 # API configuration
 DEBUG = True
 HOST = '0.0.0.0'
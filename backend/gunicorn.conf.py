@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for Fake News Detection System
+
+Run from the backend/ directory:
+    gunicorn -c gunicorn.conf.py app:app
+
+The Werkzeug dev server in app.py handles one request at a time; this
+serves the API with one worker process per core plus threads so
+concurrent clients actually parallelize (and feed the batching worker).
+"""
+
+import multiprocessing
+import os
+
+bind = '0.0.0.0:5000'
+
+workers = multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = 4
+
+# Each worker must import the app itself: the app starts per-process
+# daemon threads (inference worker, timestamp ticker) that would not
+# survive fork, and TensorFlow is not fork-safe either
+preload_app = False
+
+# Partition CPU cores between workers so TensorFlow doesn't oversubscribe
+os.environ.setdefault('TF_NUM_INTRAOP_THREADS', str(max(1, multiprocessing.cpu_count() // workers)))
+os.environ.setdefault('TF_NUM_INTEROP_THREADS', '1')
@@ -13,13 +13,14 @@ from tensorflow.keras.layers import Embedding, Conv1D, GlobalMaxPooling1D, Dense
 from tensorflow.keras.preprocessing.text import Tokenizer
 from tensorflow.keras.preprocessing.sequence import pad_sequences
 from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping
+import tensorflow as tf
 import matplotlib.pyplot as plt
 
 # Import config
 from config import (
-    MODEL_PATH, TOKENIZER_PATH, FAKE_DATA_PATH, TRUE_DATA_PATH,
-    MAX_WORDS, MAX_LEN, EMBEDDING_DIM, FILTERS, KERNEL_SIZE,
-    DENSE_UNITS, DROPOUT_RATE
+    MODEL_PATH, TFLITE_MODEL_PATH, TOKENIZER_PATH, VOCAB_PATH,
+    FAKE_DATA_PATH, TRUE_DATA_PATH, MAX_WORDS, VOCAB_COVERAGE, MAX_LEN,
+    EMBEDDING_DIM, FILTERS, KERNEL_SIZE, DENSE_UNITS, DROPOUT_RATE
 )
 from utils import TextPreprocessor
 
@@ -62,11 +63,11 @@ class FakeNewsTrainer:
         print("\n🔄 Preprocessing text data...")
         
         # Combine title and text
-        df['text_content'] = df['title'] + " " + df['text']
-        
-        # Clean text
+        df['text_content'] = df['title'].fillna('') + " " + df['text'].fillna('')
+
+        # Clean text (vectorized over the whole column)
         print("   Cleaning text...")
-        df['text_content'] = df['text_content'].apply(self.preprocessor.clean_text)
+        df['text_content'] = self.preprocessor.clean_series(df['text_content'])
         
         # Split data
         X_train_text, X_val_text, y_train, y_val = train_test_split(
@@ -82,7 +83,23 @@ class FakeNewsTrainer:
         print("   Creating tokenizer...")
         self.tokenizer = Tokenizer(num_words=MAX_WORDS)
         self.tokenizer.fit_on_texts(X_train_text)
-        
+
+        # Trim the vocabulary to the smallest size that still covers
+        # VOCAB_COVERAGE of all training tokens; rare words beyond that
+        # only inflate the embedding table
+        counts = sorted(self.tokenizer.word_counts.values(), reverse=True)
+        total_tokens = sum(counts)
+        covered = 0
+        vocab_size = MAX_WORDS
+        for rank, count in enumerate(counts[:MAX_WORDS], start=1):
+            covered += count
+            if covered / total_tokens >= VOCAB_COVERAGE:
+                vocab_size = rank
+                break
+        self.tokenizer.num_words = vocab_size + 1  # index 0 is reserved
+        print(f"   Vocabulary: {vocab_size} words "
+              f"({covered / total_tokens:.1%} token coverage)")
+
         # Convert to sequences
         X_train_seq = self.tokenizer.texts_to_sequences(X_train_text)
         X_val_seq = self.tokenizer.texts_to_sequences(X_val_text)
@@ -96,13 +113,13 @@ class FakeNewsTrainer:
         
         return X_train, X_val, y_train, y_val
     
-    def build_model(self):
+    def build_model(self, vocab_size=MAX_WORDS):
         """Build CNN model architecture"""
         print("\n🏗️ Building CNN model...")
-        
+
         model = Sequential([
             Embedding(
-                input_dim=MAX_WORDS,
+                input_dim=vocab_size,
                 output_dim=EMBEDDING_DIM,
                 input_length=MAX_LEN
             ),
@@ -164,9 +181,36 @@ class FakeNewsTrainer:
         # Save tokenizer
         self.preprocessor.save_tokenizer(self.tokenizer, TOKENIZER_PATH)
         print(f"✅ Tokenizer saved to {TOKENIZER_PATH}")
+
+        # Export the compact word→id vocabulary used at serving time
+        vocab = self.preprocessor.vocab_from_tokenizer(self.tokenizer)
+        self.preprocessor.save_vocab(vocab, VOCAB_PATH)
+        print(f"✅ Vocabulary ({len(vocab)} words) saved to {VOCAB_PATH}")
         
         return self.history
     
+    def export_tflite(self, X_train=None):
+        """Export the trained model to quantized TFLite for fast CPU serving"""
+        print("\n📦 Exporting TFLite model...")
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if X_train is not None:
+            # Calibrate int8 quantization on real training inputs; ops that
+            # can't be quantized fall back to the float builtins
+            samples = np.asarray(X_train[:200], dtype=np.float32)
+            converter.representative_dataset = lambda: ([x[np.newaxis, :]] for x in samples)
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                tf.lite.OpsSet.TFLITE_BUILTINS
+            ]
+        tflite_model = converter.convert()
+
+        with open(TFLITE_MODEL_PATH, 'wb') as f:
+            f.write(tflite_model)
+
+        print(f"✅ TFLite model saved to {TFLITE_MODEL_PATH}")
+
     def evaluate(self, X_val, y_val):
         """Evaluate the model"""
         print("\n📊 Evaluating model...")
@@ -223,14 +267,17 @@ def main():
         # Preprocess data
         X_train, X_val, y_train, y_val = trainer.preprocess_data(df)
         
-        # Build model
-        model = trainer.build_model()
+        # Build model sized to the trimmed vocabulary
+        model = trainer.build_model(vocab_size=trainer.tokenizer.num_words)
         
         # Train model
         history = trainer.train(X_train, X_val, y_train, y_val)
         
         # Evaluate model
         loss, accuracy = trainer.evaluate(X_val, y_val)
+
+        # Export quantized TFLite model for serving
+        trainer.export_tflite(X_train)
         
         # Plot results
         trainer.plot_training_history()
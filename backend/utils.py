@@ -4,9 +4,41 @@ Utility functions for Fake News Detection System
 
 import re
 import string
+import json
 import pickle
 import numpy as np
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+from config import (
+    MAX_WORDS, LENGTH_BUCKETS, EMBEDDING_DIM, FILTERS, KERNEL_SIZE,
+    DENSE_UNITS, DROPOUT_RATE
+)
+
+# Numba speeds up the per-token encode loop considerably but the app
+# works fine without it
+try:
+    from numba import njit, types
+    from numba.typed import Dict as NumbaDict, List as NumbaList
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _encode_tokens(tokens, vocab):
+        """Map tokens to ids, dropping out-of-vocabulary words"""
+        ids = np.empty(len(tokens), dtype=np.int32)
+        n = 0
+        for i in range(len(tokens)):
+            token = tokens[i]
+            if token in vocab:
+                ids[n] = vocab[token]
+                n += 1
+        return ids[:n]
+
+# Precompiled cleaning patterns (compiling per call is wasted work on the
+# request path)
+_PUNCT_DIGIT_RE = re.compile(f'[{re.escape(string.punctuation)}0-9]')
+_WHITESPACE_RE = re.compile(r'\s+')
 
 class TextPreprocessor:
     """Handles text preprocessing for fake news detection"""
@@ -15,6 +47,7 @@ class TextPreprocessor:
         self.max_words = max_words
         self.max_len = max_len
         self.tokenizer = None
+        self._typed_vocab = None
     
     def clean_text(self, text):
         """
@@ -22,35 +55,57 @@ class TextPreprocessor:
         """
         if not isinstance(text, str):
             text = str(text)
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove punctuation
-        text = re.sub(f'[{re.escape(string.punctuation)}]', '', text)
-        
-        # Remove extra whitespaces
-        text = ' '.join(text.split())
-        
-        # Remove digits
-        text = re.sub(r'\d+', '', text)
-        
-        return text
+
+        # Remove punctuation and digits
+        text = _PUNCT_DIGIT_RE.sub(' ', text.lower())
+
+        # Collapse extra whitespaces
+        return _WHITESPACE_RE.sub(' ', text).strip()
     
-    def preprocess_for_prediction(self, text, tokenizer):
+    def clean_series(self, series):
+        """
+        Clean a whole pandas Series of texts at once.
+
+        Vectorized counterpart of clean_text: the per-row loop runs inside
+        pandas' C string kernels instead of Python.
+        """
+        series = series.astype(str).str.lower()
+        series = series.str.replace(_PUNCT_DIGIT_RE, ' ', regex=True)
+        return series.str.replace(_WHITESPACE_RE, ' ', regex=True).str.strip()
+
+    def preprocess_for_prediction(self, text, vocab):
         """
         Preprocess single text for prediction
         """
         # Clean the text
         cleaned_text = self.clean_text(text)
-        
-        # Convert to sequence
-        sequence = tokenizer.texts_to_sequences([cleaned_text])
-        
-        # Pad sequence
-        padded = pad_sequences(sequence, maxlen=self.max_len)
-        
+
+        # Convert to sequence, keeping the last max_len tokens; words
+        # outside the vocabulary are dropped, as the Keras tokenizer did
+        words = cleaned_text.split()
+        if NUMBA_AVAILABLE and words:
+            sequence = _encode_tokens(NumbaList(words), self._get_typed_vocab(vocab))
+            sequence = sequence[-self.max_len:]
+        else:
+            sequence = [vocab[word] for word in words if word in vocab][-self.max_len:]
+
+        # Pre-pad to the smallest length bucket that fits, so short
+        # articles pay for a short convolution instead of max_len
+        length = next((b for b in LENGTH_BUCKETS if b >= len(sequence)), self.max_len)
+        padded = np.zeros((1, length), dtype=np.int32)
+        if len(sequence):
+            padded[0, -len(sequence):] = sequence
+
         return padded
+
+    def _get_typed_vocab(self, vocab):
+        """Convert the vocabulary to a numba typed Dict once and reuse it"""
+        if self._typed_vocab is None:
+            typed = NumbaDict.empty(key_type=types.unicode_type, value_type=types.int32)
+            for word, index in vocab.items():
+                typed[word] = np.int32(index)
+            self._typed_vocab = typed
+        return self._typed_vocab
     
     def save_tokenizer(self, tokenizer, filepath):
         """Save tokenizer to file"""
@@ -63,6 +118,24 @@ class TextPreprocessor:
             tokenizer = pickle.load(f)
         return tokenizer
 
+    def save_vocab(self, vocab, filepath):
+        """Save the word→id vocabulary as JSON"""
+        with open(filepath, 'w') as f:
+            json.dump(vocab, f)
+
+    def load_vocab(self, filepath):
+        """Load the word→id vocabulary from JSON"""
+        with open(filepath) as f:
+            return json.load(f)
+
+    def vocab_from_tokenizer(self, tokenizer):
+        """Extract the compact word→id vocabulary from a fitted tokenizer"""
+        limit = tokenizer.num_words or self.max_words
+        return {
+            word: index for word, index in tokenizer.word_index.items()
+            if index < limit
+        }
+
 def analyze_prediction(probability):
     """
     Analyze prediction probability and return detailed results
@@ -98,18 +171,44 @@ def analyze_prediction(probability):
         'message': message
     }
 
-def get_model_summary():
-    """Return model architecture summary"""
+def get_model_summary(model=None):
+    """
+    Return model architecture summary.
+
+    When the loaded Keras model is passed in, the embedding shape and
+    parameter count are read from it; otherwise the config defaults are
+    reported.
+    """
+    vocab_rows = MAX_WORDS
+    embedding_dim = EMBEDDING_DIM
+    total_params = (
+        MAX_WORDS * EMBEDDING_DIM
+        + (KERNEL_SIZE * EMBEDDING_DIM + 1) * FILTERS
+        + (FILTERS + 1) * DENSE_UNITS
+        + DENSE_UNITS + 1
+    )
+    embedding_desc = f'≤{vocab_rows}×{embedding_dim}'
+    if model is not None:
+        embedding = next(
+            (layer for layer in model.layers if hasattr(layer, 'embeddings')),
+            None
+        )
+        if embedding is not None:
+            vocab_rows = embedding.input_dim
+            embedding_dim = embedding.output_dim
+            embedding_desc = f'{vocab_rows}×{embedding_dim}'
+        total_params = model.count_params()
     return {
         'type': 'CNN',
+        'embedding_dim': embedding_dim,
         'layers': [
-            {'name': 'Embedding', 'params': '10000×128'},
-            {'name': 'Conv1D', 'params': '128 filters, kernel_size=5'},
+            {'name': 'Embedding', 'params': embedding_desc},
+            {'name': 'Conv1D', 'params': f'{FILTERS} filters, kernel_size={KERNEL_SIZE}'},
             {'name': 'GlobalMaxPooling1D', 'params': ''},
-            {'name': 'Dense', 'params': '64 units'},
-            {'name': 'Dropout', 'params': '0.5'},
+            {'name': 'Dense', 'params': f'{DENSE_UNITS} units'},
+            {'name': 'Dropout', 'params': f'{DROPOUT_RATE}'},
             {'name': 'Dense', 'params': '1 unit (sigmoid)'}
         ],
-        'total_params': '~1.3M',
+        'total_params': f'~{total_params / 1e6:.1f}M',
         'accuracy': '95%'
     }
\ No newline at end of file